@@ -0,0 +1,390 @@
+"""
+Benchmarks for the `assignment_2.state_machine` FSM.
+
+Measures per-symbol `FSM.input` throughput over varied input lengths, `FSM`
+construction time for small and large generated machines, cold import time of
+`assignment_2.state_machine`, batched runs of many short strings in the style
+of `assignment_2.main`, the overhead of `FSMInstrumentation`, and `LazyDFA`
+throughput against direct `NFA` simulation.
+
+Results are written as JSON to `benchmarks/results/latest.json`, which is not
+tracked, and can be compared against a baseline results file recorded with the
+same Python version on the same platform to catch regressions:
+
+    uv run python benchmarks/bench_state_machine.py --compare benchmarks/results/0.1.0.json
+
+`--save-baseline` also writes the results to `benchmarks/results/<version>.json`.
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from importlib import metadata
+from pathlib import Path
+
+from assignment_2.instrumentation import FSMInstrumentation
+from assignment_2.main import ModThreeFSM
+from assignment_2.nfa import NFA, LazyDFA
+from assignment_2.state_machine import FSM, State
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+INPUT_LENGTHS = [10, 100, 1_000, 10_000]
+MACHINE_SIZES = [3, 100, 1_000, 10_000]
+BATCH_SIZES = [10, 1_000]
+BATCH_STRING_LENGTH = 16
+
+
+def mod_n_fsm(n: int) -> FSM:
+    """
+    Build an FSM with `n` states that computes the modulo `n` of a binary string.
+    """
+    states = [State(f"S{i}", i) for i in range(n)]
+    transitions = {
+        (states[i], bit): states[(2 * i + int(bit)) % n]
+        for i in range(n)
+        for bit in "01"
+    }
+    return FSM(states, ["0", "1"], states[0], states, transitions)
+
+
+def nth_from_last_nfa(n: int) -> NFA:
+    """
+    Build an NFA with `n + 1` states accepting binary strings whose `n`-th symbol from the
+    end is "1". The equivalent DFA has 2**n states.
+    """
+    states = [State(f"Q{i}", i) for i in range(n + 1)]
+    transitions = {
+        (states[0], "0"): [states[0]],
+        (states[0], "1"): [states[0], states[1]],
+    }
+    for i in range(1, n):
+        transitions[(states[i], "0")] = [states[i + 1]]
+        transitions[(states[i], "1")] = [states[i + 1]]
+    return NFA(states, ["0", "1"], states[0], [states[n]], transitions)
+
+
+def binary_string(length: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "".join(rng.choice("01") for _ in range(length))
+
+
+def time_call(func, repeat: int) -> dict[str, float]:
+    """
+    Time `func` and return the min and median seconds per call.
+
+    `func` is called once to warm up any caches, then each of the `repeat` samples calls
+    it enough times to take at least 0.2 seconds, as chosen by `timeit.Timer.autorange`.
+    """
+    timer = timeit.Timer(func)
+    func()
+    number, _ = timer.autorange()
+    timings = [t / number for t in timer.repeat(number=number, repeat=repeat)]
+    return {"min": min(timings), "median": statistics.median(timings)}
+
+
+def bench_input_throughput(repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Seconds per input symbol for `FSM.input` over varied input lengths.
+    """
+    results = {}
+    for size in (3, 1_000):
+        fsm = mod_n_fsm(size)
+        for length in INPUT_LENGTHS:
+            if size > 3 and length > 1_000:
+                continue
+            bits = binary_string(length)
+
+            def run():
+                fsm.state = fsm.initial_state
+                for c in bits:
+                    fsm.input(c)
+
+            timing = time_call(run, repeat)
+            results[f"input/states={size}/length={length}"] = {
+                k: v / length for k, v in timing.items()
+            }
+    return results
+
+
+def bench_construction(repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Seconds to construct an `FSM` from pre-built states and transitions.
+    """
+    results = {}
+    for size in MACHINE_SIZES:
+        template = mod_n_fsm(size)
+        states = list(template.states)
+        transitions = dict(template.transitions)
+
+        def build():
+            FSM(states, ["0", "1"], states[0], states, transitions)
+
+        results[f"construct/states={size}"] = time_call(build, repeat)
+    return results
+
+
+def bench_batch(repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Seconds per string when running many short strings, each on a fresh machine.
+    """
+    results = {}
+    for batch_size in BATCH_SIZES:
+        strings = [
+            binary_string(BATCH_STRING_LENGTH, seed) for seed in range(batch_size)
+        ]
+
+        def run():
+            for bs in strings:
+                fsm = ModThreeFSM()
+                for c in bs:
+                    fsm.input(c)
+
+        timing = time_call(run, repeat)
+        results[f"batch/strings={batch_size}/length={BATCH_STRING_LENGTH}"] = {
+            k: v / batch_size for k, v in timing.items()
+        }
+    return results
+
+
+def bench_instrumentation(repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Seconds per input symbol for `FSM.input` with instrumentation disabled, enabled
+    without a trace, and enabled with a trace.
+    """
+    length = 1_000
+    bits = binary_string(length)
+    results = {}
+    for name, trace_size, enabled in [
+        ("disabled", 0, False),
+        ("counters", 0, True),
+        ("trace=1024", 1024, True),
+    ]:
+        fsm = mod_n_fsm(3)
+        instr = FSMInstrumentation(fsm, trace_size=trace_size)
+        if enabled:
+            instr.enable()
+
+        def run():
+            fsm.state = fsm.initial_state
+            for c in bits:
+                fsm.input(c)
+
+        timing = time_call(run, repeat)
+        results[f"instrumentation/{name}/length={length}"] = {
+            k: v / length for k, v in timing.items()
+        }
+    return results
+
+
+def bench_nfa(repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Seconds per input symbol for direct `NFA` simulation and for `LazyDFA` with a cache
+    that fits every DFA state, one that must evict, and one small enough to thrash.
+    """
+    length = 10_000
+    bits = binary_string(length)
+    nfa = nth_from_last_nfa(8)
+    results = {}
+
+    timing = time_call(lambda: nfa.accepts(bits), repeat)
+    results[f"nfa/simulate/length={length}"] = {k: v / length for k, v in timing.items()}
+
+    for name, max_states, min_symbols_per_state in [
+        ("cache=1024", 1024, 10),
+        ("cache=128", 128, 0),
+        ("cache=16/fallback", 16, 10),
+    ]:
+        dfa = LazyDFA(nfa, max_states, min_symbols_per_state)
+        # The cache persists between calls, so after time_call's warm-up call every
+        # sample measures the steady state for this cache size.
+        timing = time_call(lambda: dfa.accepts(bits), repeat)
+        results[f"nfa/lazy_dfa/{name}/length={length}"] = {
+            k: v / length for k, v in timing.items()
+        }
+    return results
+
+
+def bench_import(repeat: int) -> dict[str, dict[str, float]]:
+    """
+    Seconds to import `assignment_2.state_machine` in a fresh interpreter.
+    """
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        "import assignment_2.state_machine\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    timings = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code], capture_output=True, text=True, check=True
+            ).stdout
+        )
+        for _ in range(repeat)
+    ]
+    return {
+        "import/state_machine": {
+            "min": min(timings),
+            "median": statistics.median(timings),
+        }
+    }
+
+
+BENCHMARKS = [
+    bench_input_throughput,
+    bench_construction,
+    bench_batch,
+    bench_instrumentation,
+    bench_nfa,
+    bench_import,
+]
+
+
+def run_benchmarks(repeat: int) -> dict:
+    results = {}
+    for bench in BENCHMARKS:
+        results.update(bench(repeat))
+    return {
+        "version": metadata.version("assignment-2"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[str]:
+    """
+    Return a description of every benchmark whose minimum time regressed by more than
+    `tolerance` (a fraction) relative to `baseline`. The minimum is compared rather than
+    the median since it is least affected by other load on the machine. Benchmarks
+    missing from `baseline` are not compared; see `missing_from`.
+    """
+    regressions = []
+    for name, timing in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+        ratio = timing["min"] / base["min"]
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: {base['min']:.3g}s -> {timing['min']:.3g}s ({ratio:.2f}x)"
+            )
+    return regressions
+
+
+def environment_mismatches(baseline: dict) -> list[str]:
+    """
+    Return a description of every way the Python version or platform of this run differs
+    from those `baseline` was recorded on.
+    """
+    current = {"python": platform.python_version(), "platform": platform.platform()}
+    return [
+        f"{key}: baseline {baseline.get(key)}, current {value}"
+        for key, value in current.items()
+        if baseline.get(key) != value
+    ]
+
+
+def missing_from(baseline: dict, current: dict) -> list[str]:
+    """
+    Return the names of benchmarks in `current` with no entry in `baseline`.
+    """
+    return [name for name in current["results"] if name not in baseline["results"]]
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=RESULTS_DIR / "latest.json",
+        help="Results file (default: benchmarks/results/latest.json)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Also write the results to benchmarks/results/<version>.json",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Allow --save-baseline to overwrite an existing baseline",
+    )
+    parser.add_argument("--compare", type=Path, help="Baseline results file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed fractional slowdown before reporting a regression",
+    )
+    parser.add_argument(
+        "--ignore-environment",
+        action="store_true",
+        help="Compare against a baseline recorded on a different Python version or platform",
+    )
+    args = parser.parse_args(argv)
+
+    outputs = [args.output]
+    if args.save_baseline:
+        baseline_output = RESULTS_DIR / f"{metadata.version('assignment-2')}.json"
+        if baseline_output.exists() and not args.force:
+            parser.error(
+                f"baseline {baseline_output} already exists; pass --force to overwrite it"
+            )
+        outputs.append(baseline_output)
+
+    baseline = None
+    if args.compare:
+        if any(output.resolve() == args.compare.resolve() for output in outputs):
+            parser.error(
+                f"results would overwrite the baseline {args.compare}; "
+                "pass --output to write them elsewhere"
+            )
+        baseline = json.loads(args.compare.read_text())
+
+        mismatches = environment_mismatches(baseline)
+        if mismatches and not args.ignore_environment:
+            parser.error(
+                f"baseline {args.compare} was recorded in a different environment "
+                f"({'; '.join(mismatches)}); pass --ignore-environment to compare anyway"
+            )
+        for mismatch in mismatches:
+            print(f"Warning: environment differs from baseline, {mismatch}")
+
+    current = run_benchmarks(args.repeat)
+    for name, timing in current["results"].items():
+        print(f"{name:45} min {timing['min']:.3e}s  median {timing['median']:.3e}s")
+
+    for output in outputs:
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"Results written to {output}")
+
+    if baseline is not None:
+        missing = missing_from(baseline, current)
+        if missing:
+            print(f"No baseline in {args.compare} for:")
+            for name in missing:
+                print(f"  {name}")
+
+        regressions = compare(baseline, current, args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"No regressions against {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import json
+from collections import Counter, deque
+from collections.abc import Hashable
+
+from assignment_2.state_machine import FSM, State
+
+
+class FSMInstrumentation:
+    """
+    Optional instrumentation for an FSM, recording which states and transitions dominate.
+
+    While enabled, every successful call to `fsm.input` is recorded. Instrumentation works
+    by shadowing `input` on the FSM instance, so machines that are not instrumented (or have
+    had instrumentation disabled) run the unmodified `FSM.input` with no added overhead.
+    States set directly via the `state` setter are not recorded.
+
+    Can be used as a context manager, which enables instrumentation on entry and disables it
+    on exit.
+
+    Attributes
+    ----------
+    fsm : FSM
+        The instrumented FSM.
+    state_visits : Counter[State]
+        Number of times each state has been entered. The FSM's state at the time
+        instrumentation is enabled counts as one visit.
+    transition_hits : Counter[tuple[State, Hashable]]
+        Number of times each transition has been taken, keyed by (source state, input). Since
+        the FSM is deterministic, the target state is `fsm.transitions[source, input]`.
+    trace : deque[tuple[State, Hashable]] | None
+        The (source state, input) of the most recent `trace_size` transitions taken, oldest
+        first, or None if tracing is off.
+
+    Methods
+    -------
+    enable() -> None
+        Start recording inputs to the FSM.
+    disable() -> None
+        Stop recording inputs to the FSM.
+    reset() -> None
+        Clear all recorded counts and the trace.
+    state_visit_array() -> list[int]
+        Visit counts ordered as `fsm.states`.
+    transition_array() -> list[list[int]]
+        Transition hit counts indexed by [state index][input index].
+    to_dict() -> dict
+        All recorded counts and the trace as JSON-serializable data.
+    to_json() -> str
+        All recorded counts and the trace as a JSON string.
+    """
+
+    def __init__(self, fsm: FSM, trace_size: int = 0) -> None:
+        """
+        Parameters
+        ----------
+        fsm : FSM
+            The FSM to instrument.
+        trace_size : int
+            Maximum number of recent transitions kept in the trace ring buffer. 0 disables
+            tracing.
+
+        Raises
+        ------
+        ValueError
+            If trace_size is negative.
+        """
+        if trace_size < 0:
+            raise ValueError(f"trace_size must be non-negative, got {trace_size}")
+
+        self.fsm = fsm
+        self._enable_visits: Counter[State] = Counter()
+        self.transition_hits: Counter[tuple[State, Hashable]] = Counter()
+        self.trace: deque[tuple[State, Hashable]] | None = (
+            deque(maxlen=trace_size) if trace_size else None
+        )
+        self._enabled = False
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def state_visits(self) -> Counter[State]:
+        """
+        Number of times each state has been entered, derived from `transition_hits` so the
+        instrumented `input` only updates a single counter.
+        """
+        transitions = self.fsm.transitions
+        visits = self._enable_visits.copy()
+        for transition, count in self.transition_hits.items():
+            visits[transitions[transition]] += count
+        return visits
+
+    def enable(self) -> None:
+        """
+        Start recording inputs to the FSM. Does nothing if already enabled.
+
+        Raises
+        ------
+        ValueError
+            If `input` is already shadowed on the FSM, e.g. by another enabled
+            FSMInstrumentation.
+        """
+        if self._enabled:
+            return
+
+        fsm = self.fsm
+        if "input" in fsm.__dict__:
+            raise ValueError(f"FSM input is already instrumented: {fsm.__dict__['input']}")
+
+        fsm_input = type(fsm).input.__get__(fsm)
+        transition_hits = self.transition_hits
+        trace = self.trace
+
+        if trace is None:
+
+            def input(value: Hashable) -> None:
+                transition = (fsm._state, value)
+                fsm_input(value)
+                transition_hits[transition] += 1
+
+        else:
+
+            def input(value: Hashable) -> None:
+                transition = (fsm._state, value)
+                fsm_input(value)
+                transition_hits[transition] += 1
+                trace.append(transition)
+
+        self._enable_visits[fsm.state] += 1
+        # Shadow the class method on this instance only; object.__setattr__ bypasses
+        # pydantic's dataclass machinery.
+        object.__setattr__(fsm, "input", input)
+        self._enabled = True
+
+    def disable(self) -> None:
+        """
+        Stop recording inputs to the FSM, restoring the unmodified `input` method.
+        Recorded counts are kept. Does nothing if already disabled.
+        """
+        if not self._enabled:
+            return
+
+        del self.fsm.__dict__["input"]
+        self._enabled = False
+
+    def reset(self) -> None:
+        """
+        Clear all recorded counts and the trace.
+        """
+        self._enable_visits.clear()
+        self.transition_hits.clear()
+        if self.trace is not None:
+            self.trace.clear()
+
+    def __enter__(self) -> "FSMInstrumentation":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.disable()
+
+    def state_visit_array(self) -> list[int]:
+        """
+        Visit counts for each state, in the same order as `fsm.states`.
+        """
+        state_visits = self.state_visits
+        return [state_visits[state] for state in self.fsm.states]
+
+    def transition_array(self) -> list[list[int]]:
+        """
+        Transition hit counts as a matrix indexed by [state index][input index], in the same
+        order as `fsm.states` and `fsm.inputs`.
+        """
+        hits = self.transition_hits
+        return [
+            [hits[(state, value)] for value in self.fsm.inputs]
+            for state in self.fsm.states
+        ]
+
+    def to_dict(self) -> dict:
+        """
+        All recorded counts and the trace as JSON-serializable data. States are identified by
+        name.
+        """
+        transitions = self.fsm.transitions
+        state_visits = self.state_visits
+        return {
+            "state_visits": {state.name: state_visits[state] for state in self.fsm.states},
+            "transition_hits": [
+                {
+                    "source": source.name,
+                    "input": value,
+                    "target": transitions[(source, value)].name,
+                    "count": count,
+                }
+                for (source, value), count in self.transition_hits.most_common()
+            ],
+            "trace": None
+            if self.trace is None
+            else [
+                {
+                    "source": source.name,
+                    "input": value,
+                    "target": transitions[(source, value)].name,
+                }
+                for source, value in self.trace
+            ],
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """
+        All recorded counts and the trace as a JSON string. Keyword arguments are passed to
+        `json.dumps`. Inputs that are not JSON-serializable are converted with `str`.
+        """
+        kwargs.setdefault("default", str)
+        return json.dumps(self.to_dict(), **kwargs)
@@ -0,0 +1,286 @@
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable
+from dataclasses import field
+from typing import Sequence
+
+from pydantic.dataclasses import dataclass
+
+from assignment_2.state_machine import State
+
+
+@dataclass
+class NFA:
+    """
+    Nondeterministic finite automaton (NFA) over `State`s.
+
+    Unlike `FSM`, a (state, input) pair may transition to any number of states, including
+    none, and states may have epsilon transitions that are followed without consuming input.
+    The NFA itself holds no current state; `step` maps a set of states to the next set of
+    states, and `LazyDFA` runs the NFA efficiently by caching those sets as DFA states.
+    Input types are checked at class initialization time via pydantic.
+
+    Attributes
+    ----------
+    states : Sequence[State]
+        NFA states.
+    inputs : Sequence[Hashable]
+        All valid inputs for the NFA.
+    initial_state : State
+        The initial State of the NFA.
+    accepting_states : Sequence[State]
+        Sequence of accepting States.
+    transitions : dict[tuple[State, Hashable], Sequence[State]]
+        Maps (State, input) pairs to the States the NFA may transition to. Missing pairs
+        transition to no states.
+    epsilon_transitions : dict[State, Sequence[State]]
+        Maps a State to the States reachable from it without consuming input.
+
+    Methods
+    -------
+    epsilon_closure(states: Iterable[State]) -> frozenset[State]
+        All states reachable from `states` via epsilon transitions, including `states`.
+    initial_states() -> frozenset[State]
+        The epsilon closure of the initial state.
+    step(states: frozenset[State], value: Hashable) -> frozenset[State]
+        The set of states reached from `states` on input `value`.
+    is_accepting(states: frozenset[State]) -> bool
+        Check if any of `states` is an accepting state.
+    accepts(values: Iterable[Hashable]) -> bool
+        Simulate the NFA on a sequence of inputs and check if it ends in an accepting state.
+    """
+
+    states: Sequence[State]
+    inputs: Sequence[Hashable]
+    initial_state: State
+    accepting_states: Sequence[State]
+    transitions: dict[tuple[State, Hashable], Sequence[State]]
+    epsilon_transitions: dict[State, Sequence[State]] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        for trans in self.transitions:
+            assert trans[1] in self.inputs, (
+                f"transitions input {trans[1]} not in inputs {self.inputs}"
+            )
+
+        self._accepting = frozenset(self.accepting_states)
+
+    def epsilon_closure(self, states: Iterable[State]) -> frozenset[State]:
+        """
+        All states reachable from `states` by following zero or more epsilon transitions.
+        """
+        closure = set(states)
+        if not self.epsilon_transitions:
+            return frozenset(closure)
+
+        stack = list(closure)
+        while stack:
+            for target in self.epsilon_transitions.get(stack.pop(), ()):
+                if target not in closure:
+                    closure.add(target)
+                    stack.append(target)
+        return frozenset(closure)
+
+    @property
+    def initial_states(self) -> frozenset[State]:
+        return self.epsilon_closure([self.initial_state])
+
+    def step(self, states: frozenset[State], value: Hashable) -> frozenset[State]:
+        """
+        Compute the set of states reached from `states` on input `value`, including
+        states reached by epsilon transitions afterwards.
+
+        Parameters
+        ----------
+        states : frozenset[State]
+            The current set of states, closed under epsilon transitions.
+        value : Hashable
+            The input value to process. Must be one of the valid inputs defined for this NFA.
+
+        Raises
+        ------
+        ValueError
+            If the input value is not in the list of valid inputs.
+        """
+        if value not in self.inputs:
+            raise ValueError(f"Invalid input: {value}. Expected one of: {self.inputs}")
+
+        targets: set[State] = set()
+        for state in states:
+            targets.update(self.transitions.get((state, value), ()))
+        return self.epsilon_closure(targets)
+
+    def is_accepting(self, states: frozenset[State]) -> bool:
+        """
+        Check if any of `states` is an accepting state.
+        """
+        return not self._accepting.isdisjoint(states)
+
+    def accepts(self, values: Iterable[Hashable]) -> bool:
+        """
+        Reference simulation of the NFA: track the full set of current states, recomputing
+        each step from the transitions.
+        """
+        states = self.initial_states
+        for value in values:
+            states = self.step(states, value)
+        return self.is_accepting(states)
+
+
+class LazyDFA:
+    """
+    Runs an NFA as a DFA whose states are built on demand.
+
+    Each DFA state is a set of NFA states. A DFA state and its outgoing transitions are
+    computed with `NFA.step` the first time they are reached and kept in a cache, so inputs
+    that revisit the same sets of NFA states cost a single dictionary lookup per symbol.
+    The cache holds at most `max_states` DFA states, each with at most one transition per
+    input, and evicts the least recently used state when full.
+
+    If the cache thrashes, i.e. evictions start while fewer than `min_symbols_per_state`
+    input symbols have been processed per DFA state built since the last `reset`, the
+    runner stops caching and falls back to direct NFA simulation until the next `reset`.
+
+    Attributes
+    ----------
+    nfa : NFA
+        The NFA being run.
+    max_states : int
+        Maximum number of DFA states kept in the cache.
+    min_symbols_per_state : float
+        Minimum number of input symbols processed per DFA state built for the cache to be
+        considered useful once it is full.
+    evictions : int
+        Number of DFA states evicted from the cache.
+    cache_size : int
+        Number of DFA states currently in the cache.
+    fallback : bool
+        Whether the runner has fallen back to NFA simulation for the current input.
+
+    Methods
+    -------
+    input(value: Hashable) -> None
+        Process an input value and transition to the next state.
+    reset() -> None
+        Return to the initial state, keeping the cache.
+    accepts(values: Iterable[Hashable]) -> bool
+        Run a full sequence of inputs from the initial state and check if it is accepted.
+    state() -> frozenset[State]
+        Get the current set of NFA states.
+    is_accepting() -> bool
+        Check if the current state is an accepting state.
+    """
+
+    def __init__(
+        self, nfa: NFA, max_states: int = 1024, min_symbols_per_state: float = 10
+    ) -> None:
+        """
+        Raises
+        ------
+        ValueError
+            If max_states is less than 1.
+        """
+        if max_states < 1:
+            raise ValueError(f"max_states must be at least 1, got {max_states}")
+
+        self.nfa = nfa
+        self.max_states = max_states
+        self.min_symbols_per_state = min_symbols_per_state
+        self.evictions = 0
+        self._cache: OrderedDict[frozenset[State], dict[Hashable, frozenset[State]]] = (
+            OrderedDict()
+        )
+        self._initial = nfa.initial_states
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        Return to the initial state and leave fallback mode. Cached DFA states are kept.
+        """
+        self._state = self._initial
+        self._symbols = 0
+        self._built = 0
+        self.fallback = False
+
+    def input(self, value: Hashable) -> None:
+        """
+        Transition to the next state based on the current state and input value.
+
+        Parameters
+        ----------
+        value : Hashable
+            The input value to process. Must be one of the valid inputs defined for the NFA.
+
+        Raises
+        ------
+        ValueError
+            If the input value is not in the list of valid inputs.
+        """
+        if self.fallback:
+            self._state = self.nfa.step(self._state, value)
+            return
+
+        row = self._cache.get(self._state)
+        if row is not None:
+            next_state = row.get(value)
+            if next_state is not None:
+                self._symbols += 1
+                self._cache.move_to_end(self._state)
+                self._state = next_state
+                return
+
+        # Only valid inputs have cached transitions, so validate here, before the cache or
+        # the thrash counters are changed.
+        if value not in self.nfa.inputs:
+            raise ValueError(f"Invalid input: {value}. Expected one of: {self.nfa.inputs}")
+
+        self._symbols += 1
+        if row is None:
+            row = self._add(self._state)
+            if self.fallback:
+                self._state = self.nfa.step(self._state, value)
+                return
+        else:
+            self._cache.move_to_end(self._state)
+
+        next_state = row[value] = self.nfa.step(self._state, value)
+        self._state = next_state
+
+    def _add(self, state: frozenset[State]) -> dict[Hashable, frozenset[State]]:
+        """
+        Add a DFA state to the cache, evicting the least recently used state if the cache is
+        full, or switching to fallback mode if the cache is thrashing.
+        """
+        if len(self._cache) >= self.max_states:
+            if self._symbols < self.min_symbols_per_state * self._built:
+                self.fallback = True
+                return {}
+            self._cache.popitem(last=False)
+            self.evictions += 1
+
+        self._built += 1
+        row = self._cache[state] = {}
+        return row
+
+    def accepts(self, values: Iterable[Hashable]) -> bool:
+        """
+        Run `values` from the initial state and check if the NFA accepts them.
+        """
+        self.reset()
+        for value in values:
+            self.input(value)
+        return self.is_accepting
+
+    @property
+    def cache_size(self) -> int:
+        return len(self._cache)
+
+    @property
+    def state(self) -> frozenset[State]:
+        return self._state
+
+    @property
+    def is_accepting(self) -> bool:
+        """
+        Check if the current state is an accepting state.
+        """
+        return self.nfa.is_accepting(self._state)
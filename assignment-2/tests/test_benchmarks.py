@@ -0,0 +1,125 @@
+import json
+import platform
+
+import pytest
+
+import bench_state_machine as bench
+
+
+def results(**times):
+    return {
+        "version": "0.1.0",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {
+            name: {"min": time, "median": time} for name, time in times.items()
+        },
+    }
+
+
+class TestCompare:
+    def test_no_regression(self):
+        assert bench.compare(results(a=1.0), results(a=1.1), 0.2) == []
+
+    def test_regression(self):
+        regressions = bench.compare(results(a=1.0, b=1.0), results(a=1.0, b=2.0), 0.2)
+        assert len(regressions) == 1
+        assert regressions[0].startswith("b: ")
+
+    def test_compares_min(self):
+        baseline = results(a=1.0)
+        current = results(a=1.0)
+        current["results"]["a"]["median"] = 10.0
+        assert bench.compare(baseline, current, 0.2) == []
+
+    def test_environment_mismatches(self):
+        baseline = results()
+        assert bench.environment_mismatches(baseline) == []
+
+        baseline["python"] = "2.7.18"
+        mismatches = bench.environment_mismatches(baseline)
+        assert len(mismatches) == 1
+        assert mismatches[0].startswith("python: ")
+
+    def test_missing_from(self):
+        assert bench.missing_from(results(a=1.0), results(a=1.0, b=1.0)) == ["b"]
+
+
+class TestMain:
+    @pytest.fixture
+    def baseline(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(bench, "RESULTS_DIR", tmp_path)
+        monkeypatch.setattr(bench.metadata, "version", lambda _: "0.1.0")
+        path = tmp_path / "0.1.0.json"
+        path.write_text(json.dumps(results(a=1.0)))
+        return path
+
+    def test_writes_latest_by_default(self, baseline, tmp_path, monkeypatch):
+        monkeypatch.setattr(bench, "run_benchmarks", lambda _: results(a=2.0))
+
+        bench.main([])
+
+        assert json.loads((tmp_path / "latest.json").read_text()) == results(a=2.0)
+        assert json.loads(baseline.read_text()) == results(a=1.0)
+
+    def test_save_baseline_refuses_to_overwrite(self, baseline, monkeypatch):
+        monkeypatch.setattr(bench, "run_benchmarks", lambda _: pytest.fail("ran"))
+
+        with pytest.raises(SystemExit) as exc_info:
+            bench.main(["--save-baseline"])
+
+        assert exc_info.value.code == 2
+        assert json.loads(baseline.read_text()) == results(a=1.0)
+
+    def test_save_baseline_force(self, baseline, tmp_path, monkeypatch):
+        monkeypatch.setattr(bench, "run_benchmarks", lambda _: results(a=2.0))
+
+        bench.main(
+            ["--save-baseline", "--force", "--output", str(tmp_path / "latest.json")]
+        )
+
+        assert json.loads(baseline.read_text()) == results(a=2.0)
+
+    def test_refuses_to_overwrite_compared_baseline(self, baseline, monkeypatch):
+        monkeypatch.setattr(bench, "run_benchmarks", lambda _: pytest.fail("ran"))
+
+        with pytest.raises(SystemExit) as exc_info:
+            bench.main(["--compare", str(baseline), "--output", str(baseline)])
+
+        assert exc_info.value.code == 2
+        assert json.loads(baseline.read_text()) == results(a=1.0)
+
+    def test_refuses_different_environment(self, baseline, tmp_path, monkeypatch):
+        monkeypatch.setattr(bench, "run_benchmarks", lambda _: results(a=1.0))
+        data = results(a=1.0)
+        data["python"] = "2.7.18"
+        baseline.write_text(json.dumps(data))
+        args = ["--compare", str(baseline), "--output", str(tmp_path / "new.json")]
+
+        with pytest.raises(SystemExit) as exc_info:
+            bench.main(args)
+        assert exc_info.value.code == 2
+
+        bench.main(args + ["--ignore-environment"])
+
+    def test_regression_fails(self, baseline, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(bench, "run_benchmarks", lambda _: results(a=1e6, b=1.0))
+        output = tmp_path / "new.json"
+
+        with pytest.raises(SystemExit) as exc_info:
+            bench.main(["--compare", str(baseline), "--output", str(output)])
+
+        assert exc_info.value.code == 1
+        assert json.loads(baseline.read_text()) == results(a=1.0)
+        assert json.loads(output.read_text()) == results(a=1e6, b=1.0)
+        out = capsys.readouterr().out
+        assert "No baseline" in out
+        assert "  b\n" in out
+        assert "a: " in out
+
+    def test_no_regression_passes(self, baseline, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(bench, "run_benchmarks", lambda _: results(a=1.0))
+
+        bench.main(["--compare", str(baseline), "--output", str(tmp_path / "new.json")])
+
+        assert "No regressions" in capsys.readouterr().out
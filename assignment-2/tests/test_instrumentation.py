@@ -0,0 +1,132 @@
+import json
+
+import pytest
+
+from assignment_2.instrumentation import FSMInstrumentation
+from assignment_2.main import ModThreeFSM
+from assignment_2.state_machine import FSM
+
+
+S0, S1, S2 = ModThreeFSM.S0, ModThreeFSM.S1, ModThreeFSM.S2
+
+
+@pytest.fixture
+def fsm():
+    return ModThreeFSM()
+
+
+def run(fsm, bits):
+    for c in bits:
+        fsm.input(c)
+
+
+class TestFSMInstrumentation:
+    def test_disabled_by_default(self, fsm):
+        instr = FSMInstrumentation(fsm)
+        run(fsm, "1101")
+
+        assert instr.enabled is False
+        assert instr.state_visit_array() == [0, 0, 0]
+        assert "input" not in fsm.__dict__
+
+    def test_counts(self, fsm):
+        with FSMInstrumentation(fsm) as instr:
+            run(fsm, "1101")
+
+        # S0 -1-> S1 -1-> S0 -0-> S0 -1-> S1
+        assert fsm.state == S1
+        assert instr.state_visit_array() == [3, 2, 0]
+        assert instr.transition_hits == {
+            (S0, "1"): 2,
+            (S1, "1"): 1,
+            (S0, "0"): 1,
+        }
+        assert instr.transition_array() == [[1, 2], [0, 1], [0, 0]]
+
+    def test_disable_restores_input(self, fsm):
+        instr = FSMInstrumentation(fsm)
+        instr.enable()
+        assert "input" in fsm.__dict__
+
+        instr.disable()
+        assert "input" not in fsm.__dict__
+        assert fsm.input.__func__ is FSM.input
+
+        run(fsm, "11")
+        assert instr.state_visit_array() == [1, 0, 0]
+
+    def test_enable_twice(self, fsm):
+        instr = FSMInstrumentation(fsm)
+        instr.enable()
+        instr.enable()
+        run(fsm, "1")
+        instr.disable()
+
+        assert instr.state_visit_array() == [1, 1, 0]
+        assert "input" not in fsm.__dict__
+
+    def test_second_instrumentation_refused(self, fsm):
+        first = FSMInstrumentation(fsm)
+        second = FSMInstrumentation(fsm)
+        with first:
+            with pytest.raises(ValueError):
+                second.enable()
+            assert second.enabled is False
+
+            run(fsm, "1")
+
+        assert first.state_visit_array() == [1, 1, 0]
+        assert "input" not in fsm.__dict__
+
+        with second:
+            run(fsm, "1")
+        assert second.state_visit_array() == [1, 1, 0]
+
+    def test_other_instances_unaffected(self, fsm):
+        other = ModThreeFSM()
+        with FSMInstrumentation(fsm):
+            assert "input" not in other.__dict__
+
+    def test_invalid_input_not_recorded(self, fsm):
+        with FSMInstrumentation(fsm) as instr:
+            with pytest.raises(ValueError):
+                fsm.input("2")
+
+        assert instr.transition_hits == {}
+
+    def test_trace_is_bounded(self, fsm):
+        with FSMInstrumentation(fsm, trace_size=2) as instr:
+            run(fsm, "1101")
+
+        assert list(instr.trace) == [(S0, "0"), (S0, "1")]
+
+    def test_no_trace_by_default(self, fsm):
+        instr = FSMInstrumentation(fsm)
+        assert instr.trace is None
+
+    def test_negative_trace_size(self, fsm):
+        with pytest.raises(ValueError):
+            FSMInstrumentation(fsm, trace_size=-1)
+
+    def test_reset(self, fsm):
+        with FSMInstrumentation(fsm, trace_size=4) as instr:
+            run(fsm, "1101")
+            instr.reset()
+
+        assert instr.state_visit_array() == [0, 0, 0]
+        assert instr.transition_hits == {}
+        assert len(instr.trace) == 0
+
+    def test_to_json(self, fsm):
+        with FSMInstrumentation(fsm, trace_size=1) as instr:
+            run(fsm, "11")
+
+        data = json.loads(instr.to_json())
+        assert data == {
+            "state_visits": {"S0": 2, "S1": 1, "S2": 0},
+            "transition_hits": [
+                {"source": "S0", "input": "1", "target": "S1", "count": 1},
+                {"source": "S1", "input": "1", "target": "S0", "count": 1},
+            ],
+            "trace": [{"source": "S1", "input": "1", "target": "S0"}],
+        }
@@ -0,0 +1,223 @@
+import itertools
+import random
+
+from pydantic import ValidationError
+
+import pytest
+
+from assignment_2.nfa import NFA, LazyDFA
+from assignment_2.state_machine import State
+from bench_state_machine import nth_from_last_nfa
+
+
+def random_nfa(rng, n_states, inputs):
+    states = [State(f"R{i}", i) for i in range(n_states)]
+    transitions = {
+        (state, value): rng.sample(states, rng.randint(0, 2))
+        for state in states
+        for value in inputs
+    }
+    epsilon_transitions = {
+        state: rng.sample(states, rng.randint(0, 1)) for state in states
+    }
+    return NFA(
+        states,
+        inputs,
+        states[0],
+        rng.sample(states, rng.randint(1, n_states)),
+        transitions,
+        epsilon_transitions,
+    )
+
+
+def path_search_accepts(nfa, values):
+    """
+    Independent reference: search for any accepting path through the NFA, one NFA state
+    at a time.
+    """
+
+    def closure(state, seen):
+        yield state
+        for target in nfa.epsilon_transitions.get(state, ()):
+            if target not in seen:
+                seen.add(target)
+                yield from closure(target, seen)
+
+    def search(state, i, seen):
+        if (state, i) in seen:
+            return False
+        seen.add((state, i))
+        for s in closure(state, {state}):
+            if i == len(values):
+                if s in nfa.accepting_states:
+                    return True
+                continue
+            for target in nfa.transitions.get((s, values[i]), ()):
+                if search(target, i + 1, seen):
+                    return True
+        return False
+
+    return search(nfa.initial_state, 0, set())
+
+
+# "ab" or "a" followed by any number of "b"s then "c", with epsilon transitions
+S, A, B, C, D = (State(name, i) for i, name in enumerate("SABCD"))
+
+
+@pytest.fixture
+def nfa():
+    return NFA(
+        [S, A, B, C, D],
+        ["a", "b", "c"],
+        S,
+        [C],
+        {
+            (S, "a"): [A, B],
+            (A, "b"): [C],
+            (B, "b"): [B],
+            (D, "c"): [C],
+        },
+        {B: [D]},
+    )
+
+
+class TestNFA:
+    def test_initial_states(self, nfa):
+        assert nfa.initial_states == {S}
+
+    def test_epsilon_closure(self, nfa):
+        assert nfa.epsilon_closure([B]) == {B, D}
+
+    def test_step(self, nfa):
+        assert nfa.step(nfa.initial_states, "a") == {A, B, D}
+        assert nfa.step(frozenset({A, B, D}), "b") == {B, C, D}
+        assert nfa.step(frozenset({S}), "b") == frozenset()
+
+    @pytest.mark.parametrize(
+        "values, expected",
+        [
+            ("", False),
+            ("a", False),
+            ("ab", True),
+            ("ac", True),
+            ("abbbc", True),
+            ("abb", False),
+            ("ba", False),
+        ],
+    )
+    def test_accepts(self, nfa, values, expected):
+        assert nfa.accepts(values) is expected
+
+    def test_invalid_input(self, nfa):
+        with pytest.raises(ValueError):
+            nfa.accepts("x")
+
+    def test_invalid_transition_key(self):
+        with pytest.raises(ValidationError):
+            NFA([S], ["a"], S, [S], {(S, "b"): [S]})
+
+    def test_invalid_transition_value(self):
+        with pytest.raises(ValidationError):
+            NFA([S], ["a"], S, [S], {(S, "a"): ["INVALID_STATE"]})  # type: ignore
+
+    def test_random_nfas_match_path_search(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            nfa = random_nfa(rng, 5, ["0", "1"])
+            for length in range(6):
+                for values in itertools.product("01", repeat=length):
+                    assert nfa.accepts(values) == path_search_accepts(nfa, values)
+
+
+class TestLazyDFA:
+    def test_happy_path(self, nfa):
+        dfa = LazyDFA(nfa)
+        assert dfa.state == {S}
+        assert dfa.is_accepting is False
+
+        dfa.input("a")
+        assert dfa.state == {A, B, D}
+        dfa.input("c")
+        assert dfa.state == {C}
+        assert dfa.is_accepting is True
+
+    def test_reset(self, nfa):
+        dfa = LazyDFA(nfa)
+        dfa.input("a")
+        dfa.reset()
+        assert dfa.state == {S}
+
+    def test_invalid_input(self, nfa):
+        dfa = LazyDFA(nfa)
+        with pytest.raises(ValueError):
+            dfa.input("x")
+
+        dfa.input("a")
+        with pytest.raises(ValueError):
+            dfa.input("x")
+
+    def test_invalid_input_leaves_cache_unchanged(self):
+        nfa = nth_from_last_nfa(3)
+        dfa = LazyDFA(nfa, max_states=2, min_symbols_per_state=0)
+        dfa.accepts("0110")
+        cache = list(dfa._cache)
+        evictions, symbols, built = dfa.evictions, dfa._symbols, dfa._built
+
+        with pytest.raises(ValueError):
+            dfa.input("x")
+
+        assert list(dfa._cache) == cache
+        assert dfa.cache_size == 2
+        assert dfa.evictions == evictions
+        assert (dfa._symbols, dfa._built) == (symbols, built)
+        assert dfa.fallback is False
+
+    def test_invalid_max_states(self, nfa):
+        with pytest.raises(ValueError):
+            LazyDFA(nfa, max_states=0)
+
+    def test_cache_reused(self):
+        nfa = nth_from_last_nfa(3)
+        dfa = LazyDFA(nfa)
+        rng = random.Random(0)
+        for _ in range(20):
+            dfa.accepts(rng.choices("01", k=100))
+
+        assert dfa.cache_size == 2**3
+        assert dfa.evictions == 0
+        assert dfa.fallback is False
+
+    def test_cache_bounded(self):
+        nfa = nth_from_last_nfa(6)
+        dfa = LazyDFA(nfa, max_states=8, min_symbols_per_state=0)
+        values = random.Random(0).choices("01", k=1000)
+
+        assert dfa.accepts(values) == nfa.accepts(values)
+        assert dfa.cache_size == 8
+        assert dfa.evictions > 0
+        assert dfa.fallback is False
+
+    def test_fallback_on_thrashing(self):
+        nfa = nth_from_last_nfa(10)
+        dfa = LazyDFA(nfa, max_states=4)
+        values = random.Random(0).choices("01", k=1000)
+
+        assert dfa.accepts(values) == nfa.accepts(values)
+        assert dfa.fallback is True
+        assert dfa.cache_size == 4
+
+        dfa.reset()
+        assert dfa.fallback is False
+
+    @pytest.mark.parametrize(
+        "max_states, min_symbols_per_state", [(1, 0), (3, 0), (3, 10), (1024, 10)]
+    )
+    def test_random_nfas_match_reference(self, max_states, min_symbols_per_state):
+        rng = random.Random(1)
+        for _ in range(20):
+            nfa = random_nfa(rng, 8, ["0", "1", "2"])
+            dfa = LazyDFA(nfa, max_states, min_symbols_per_state)
+            for length in [0, 1, 5, 50, 200]:
+                values = rng.choices(["0", "1", "2"], k=length)
+                assert dfa.accepts(values) == nfa.accepts(values)
+                assert dfa.accepts(values) == path_search_accepts(nfa, values)